@@ -2,20 +2,189 @@
 # Claude Hooks Debug Logger
 # Logs all hook events with full JSON payload to a file
 
-LOG_DIR="/tmp/claude-hooks-debug"
+LOG_DIR="${CLAUDE_HOOKS_DEBUG_LOG_DIR:-/tmp/claude-hooks-debug}"
 LOG_FILE="$LOG_DIR/hooks-$(date +%Y-%m-%d).json"
+BLOB_DIR="$LOG_DIR/blobs"
+
+# Payload fields larger than this many bytes are moved to the blob store (0 disables)
+BLOB_THRESHOLD="${CLAUDE_HOOKS_DEBUG_BLOB_THRESHOLD:-4096}"
+
+# Capture policy (optional). Compiled once into a cache in the log directory
+# and only recompiled when the policy file changes.
+POLICY_FILE="${CLAUDE_HOOKS_DEBUG_POLICY:-${0%/*}/../capture_policy.json}"
 
 # Ensure log directory exists
 mkdir -p "$LOG_DIR"
 
+sha256() {
+  if command -v sha256sum >/dev/null 2>&1; then
+    sha256sum | cut -d' ' -f1
+  else
+    shasum -a 256 | cut -d' ' -f1
+  fi
+}
+
 # Read JSON from stdin
 INPUT=$(cat)
 
 # Get timestamp
 TIMESTAMP=$(date -u +"%Y-%m-%dT%H:%M:%SZ")
 
-# Get hook event name from input or environment
-HOOK_EVENT=$(echo "$INPUT" | jq -r '.hook_event_name // "unknown"')
+# Compile the capture policy into the cache when it is missing or stale.
+# Values are type-checked here so a typo like "Read": "0.5" is reported
+# instead of silently misbehaving in the per-event filter.
+POLICY_ARGS=(--argjson policy '[null]')
+if [ -f "$POLICY_FILE" ]; then
+  POLICY_CACHE="$LOG_DIR/.capture-policy-${POLICY_FILE//\//_}"
+
+  if [ ! -f "$POLICY_CACHE" ] || [ "$POLICY_FILE" -nt "$POLICY_CACHE" ]; then
+    if jq -c '
+      def string_list: type == "array" and all(.[]; type == "string");
+      def number_map: type == "object" and all(.[]; type == "number" and . >= 0);
+      {
+        disabled_events: (.disabled_events // []),
+        disabled_tools: (.disabled_tools // []),
+        sample_rates: (.sample_rates // {}),
+        drop_fields: (.drop_fields // []),
+        truncate_fields: (.truncate_fields // {}),
+        always_keep_errors: (if .always_keep_errors == false then false else true end)
+      }
+      | if (.disabled_events | string_list) and (.disabled_tools | string_list)
+          and (.drop_fields | string_list)
+          and (.sample_rates | number_map) and (.truncate_fields | number_map) then
+          .
+        else
+          error("invalid capture policy")
+        end' "$POLICY_FILE" > "$POLICY_CACHE.$$" 2>/dev/null; then
+      mv "$POLICY_CACHE.$$" "$POLICY_CACHE"
+    else
+      rm -f "$POLICY_CACHE.$$" "$POLICY_CACHE"
+      echo "[DEBUG] Invalid capture policy $POLICY_FILE, capturing everything" >&2
+    fi
+  fi
+
+  [ -f "$POLICY_CACHE" ] && POLICY_ARGS=(--slurpfile policy "$POLICY_CACHE")
+fi
+
+# Get hook event name, the capture policy decision and payload field sizes
+# (bytes) in a single jq pass, so the policy adds no extra processes.
+# The decision is "drop", "keep" (log as is) or "project" (fields were dropped
+# or truncated), in which case the projected input follows on a second line.
+# Sampling is keyed on tool_use_id when present so PreToolUse/PostToolUse
+# pairs are kept together; otherwise it uses $RANDOM.
+CAPTURE_FILTER='
+  def size: if . == null then 0 else tojson | utf8bytelength end;
+  [.hook_event_name // "unknown", "keep", (.tool_input? | size), (.tool_response? | size)] | @tsv'
+
+# The full filter is only used with a policy, since jq compile time grows with it
+if [ "${POLICY_ARGS[0]}" = --slurpfile ]; then
+  CAPTURE_FILTER='
+  def size: if . == null then 0 else tojson | utf8bytelength end;
+
+  # Longest prefix of a string that fits in $n UTF-8 bytes. The first $n
+  # codepoints already fit when they are ASCII, which skips the per-codepoint walk.
+  def byte_prefix($n):
+    .[:$n | floor] as $head
+    | if ($head | utf8bytelength) <= $n then
+        $head
+      else
+        ($head | explode) as $codepoints
+        | ([foreach $codepoints[] as $c (0;
+              . + (if $c < 128 then 1 elif $c < 2048 then 2 elif $c < 65536 then 3 else 4 end))]
+           | map(select(. <= $n)) | length) as $count
+        | $codepoints[:$count] | implode
+      end;
+
+  def project($p):
+    reduce $p.drop_fields[] as $field (.; delpaths([$field | split(".")]))
+    | reduce ($p.truncate_fields | to_entries[]) as $t (.;
+        ($t.key | split(".")) as $path
+        | (try getpath($path) catch null) as $value
+        | if $value == null then
+            .
+          else
+            ($value | if type == "string" then . else tojson end) as $text
+            | ($text | utf8bytelength) as $size
+            | if $size > $t.value then
+                setpath($path; {"$truncated": true, size: $size, preview: ($text | byte_prefix($t.value))})
+              else
+                .
+              end
+          end);
+
+  $policy[0] as $p
+  | (.hook_event_name // "unknown") as $event
+  | (.tool_name // "") as $tool
+  | (if (.tool_use_id | type) == "string" and .tool_use_id != "" then
+       .tool_use_id | reduce explode[] as $c (0; ((. + $c) * 2097143) % 2147483647) % 10000
+     else
+       $random / 32768 * 10000 | floor
+     end) as $roll
+  | (
+      $event == "PostToolUseFailure"
+      or (.tool_response | type == "object"
+          and ((.is_error // false) == true or ((.error // "") | tostring) != ""))
+    ) as $is_error
+  | if $is_error and $p.always_keep_errors then
+      [$event, "keep", (.tool_input? | size), (.tool_response? | size)] | @tsv
+    elif ($p.disabled_events | index($event)) != null
+      or ($tool != "" and ($p.disabled_tools | index($tool)) != null)
+      or $roll >= (($p.sample_rates[$tool] // $p.sample_rates[$event] // 1) * 10000) then
+      [$event, "drop", 0, 0] | @tsv
+    else
+      project($p) as $projected
+      | if $projected == . then
+          [$event, "keep", (.tool_input? | size), (.tool_response? | size)] | @tsv
+        else
+          ([$event, "project", ($projected.tool_input? | size), ($projected.tool_response? | size)] | @tsv),
+          ($projected | tojson)
+        end
+    end'
+fi
+
+{
+  IFS=$'\t' read -r HOOK_EVENT CAPTURE TOOL_INPUT_SIZE TOOL_RESPONSE_SIZE
+  [ "$CAPTURE" = project ] && IFS= read -r INPUT
+} < <(echo "$INPUT" | jq -r "${POLICY_ARGS[@]}" --argjson random "$RANDOM" "$CAPTURE_FILTER")
+
+# Nothing to log if the policy filtered this event out
+[ "$CAPTURE" = drop ] && exit 0
+
+# Move large payload fields into a content-addressed blob store so repeated
+# bodies (the same file read over and over) are stored and compressed once.
+# The log entry keeps a {"$blob": <sha256>, "size": <bytes>} reference.
+# Sizes come from the initial jq pass (after any policy projection), so fields
+# at or under the threshold are skipped without another jq call.
+if [ "$BLOB_THRESHOLD" -gt 0 ]; then
+  for FIELD in tool_input tool_response; do
+    if [ "$FIELD" = tool_input ]; then
+      [ "${TOOL_INPUT_SIZE:-0}" -le "$BLOB_THRESHOLD" ] && continue
+    else
+      [ "${TOOL_RESPONSE_SIZE:-0}" -le "$BLOB_THRESHOLD" ] && continue
+    fi
+
+    BODY=$(echo "$INPUT" | jq -c --arg field "$FIELD" '.[$field]? // empty')
+    [ -z "$BODY" ] && continue
+
+    SIZE=$(printf '%s' "$BODY" | wc -c | tr -d ' ')
+    [ "$SIZE" -le "$BLOB_THRESHOLD" ] && continue
+
+    HASH=$(printf '%s' "$BODY" | sha256)
+    BLOB_FILE="$BLOB_DIR/$HASH.json.gz"
+
+    if [ ! -f "$BLOB_FILE" ]; then
+      mkdir -p "$BLOB_DIR"
+      # Write to a temp file first so readers never see a partial blob
+      printf '%s' "$BODY" | gzip -c > "$BLOB_FILE.$$" && mv "$BLOB_FILE.$$" "$BLOB_FILE"
+    fi
+
+    INPUT=$(echo "$INPUT" | jq \
+      --arg field "$FIELD" \
+      --arg hash "$HASH" \
+      --argjson size "$SIZE" \
+      '.[$field] = {"$blob": $hash, size: $size}')
+  done
+fi
 
 # Build log entry with metadata
 LOG_ENTRY=$(jq -n \
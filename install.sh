@@ -27,6 +27,31 @@ fi
 # Read our hook settings
 NEW_HOOKS=$(cat "$SCRIPT_DIR/settings.json" | jq '.hooks')
 
+# Don't register hooks for events disabled in the capture policy.
+# The policy is validated the same way as in hooks/debug_logger.sh, so a policy
+# the logger would ignore doesn't prune any events here either.
+POLICY_FILE="${CLAUDE_HOOKS_DEBUG_POLICY:-$SCRIPT_DIR/capture_policy.json}"
+if [ -f "$POLICY_FILE" ]; then
+    if FILTERED_HOOKS=$(echo "$NEW_HOOKS" | jq --slurpfile policy "$POLICY_FILE" '
+      def string_list: type == "array" and all(.[]; type == "string");
+      def number_map: type == "object" and all(.[]; type == "number" and . >= 0);
+      $policy[0] as $p
+      | if ($p | type) == "object"
+          and ($p.disabled_events // [] | string_list) and ($p.disabled_tools // [] | string_list)
+          and ($p.drop_fields // [] | string_list)
+          and ($p.sample_rates // {} | number_map) and ($p.truncate_fields // {} | number_map) then
+          with_entries(select(.key as $event | ($p.disabled_events // []) | index($event) | not))
+        else
+          error("invalid capture policy")
+        end
+    ' 2>/dev/null) && [ -n "$FILTERED_HOOKS" ]; then
+        NEW_HOOKS="$FILTERED_HOOKS"
+        echo "Using capture policy: $POLICY_FILE"
+    else
+        echo "Warning: invalid capture policy $POLICY_FILE, installing hooks for all events"
+    fi
+fi
+
 # First, remove any existing debug hooks to prevent duplicates
 CLEANED=$(echo "$EXISTING" | jq '
   if .hooks then
@@ -56,17 +81,19 @@ MERGED=$(echo "$CLEANED" | jq --argjson new_hooks "$NEW_HOOKS" '
   )
 ')
 
+# Never overwrite settings with an empty result if any jq step failed
+if [ -z "$MERGED" ]; then
+    echo "Error: failed to merge hooks, $CLAUDE_SETTINGS left unchanged"
+    exit 1
+fi
+
 # Write merged settings
 echo "$MERGED" | jq '.' > "$CLAUDE_SETTINGS"
 
 echo "Installed debug hooks to: $CLAUDE_SETTINGS"
 echo ""
 echo "Hooks configured:"
-echo "  - PreToolUse"
-echo "  - PostToolUse"
-echo "  - Stop"
-echo "  - Notification"
-echo "  - UserPromptSubmit"
+echo "$NEW_HOOKS" | jq -r 'keys_unsorted[] | "  - " + .'
 echo ""
 echo "Logs will be written to: /tmp/claude-hooks-debug/hooks-YYYY-MM-DD.json"
 echo ""
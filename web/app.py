@@ -4,18 +4,58 @@ Claude Hooks Debug - Web Log Viewer
 A simple web app to view and filter Claude Code hook logs.
 """
 
+import gzip
+import hashlib
 import json
 import os
 import re
 import time
-from datetime import datetime
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
 from flask import Flask, render_template, request, jsonify, Response
+from werkzeug.http import is_resource_modified, quote_etag
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
 
 app = Flask(__name__)
 
 LOG_DIR = "/tmp/claude-hooks-debug"
 
+# Log files for days before today never change, so their responses can be cached
+CLOSED_DAY_MAX_AGE = 365 * 24 * 60 * 60
+
+# Responses smaller than this are not worth compressing
+COMPRESS_MIN_SIZE = 500
+COMPRESSIBLE_MIMETYPES = {'application/json', 'text/html', 'text/plain'}
+
+# Timestamp format written by the logger (UTC)
+TIMESTAMP_FORMAT = '%Y-%m-%dT%H:%M:%SZ'
+
+# strftime only zero-pads years on some platforms, so times before this can't
+# be compared as strings; ranges are clamped to it
+EARLIEST_TIME = datetime(1000, 1, 1)
+
+# Log entry start at the beginning of a line, capturing its timestamp
+ENTRY_START_RE = re.compile(rb'(?<![^\n])\{(?:\n  )?"timestamp": ?"([^"]*)"')
+
+# Bytes read per probe when seeking to the next entry boundary
+SEEK_CHUNK_SIZE = 4096
+
+# Async hooks can append slightly out of order, so widen seeks by this much
+# and filter exactly afterwards
+TIME_SEEK_SLACK = timedelta(seconds=60)
+
+# Compressed blob bytes kept in memory (least recently used evicted first).
+# Blobs are immutable, so cached entries never go stale; only the compressed
+# form is cached so large payloads don't pile up decoded in a long-running viewer.
+BLOB_CACHE_MAX_BYTES = 16 * 1024 * 1024
+blob_cache = OrderedDict()
+blob_cache_bytes = 0
+
 # Track file positions for SSE
 file_positions = {}
 
@@ -45,11 +85,173 @@ def find_all_log_entry_positions(content):
     return sorted(set(positions))
 
 
-def parse_log_file(filepath):
-    """Parse a log file containing concatenated JSON objects."""
+def is_blob_ref(value):
+    """Check if a payload field was moved to the blob store by the logger."""
+    return isinstance(value, dict) and isinstance(value.get('$blob'), str)
+
+
+def cache_blob(path, data):
+    """Add compressed blob bytes to the cache, evicting old entries over budget."""
+    global blob_cache_bytes
+    if len(data) > BLOB_CACHE_MAX_BYTES or path in blob_cache:
+        return
+    blob_cache[path] = data
+    blob_cache_bytes += len(data)
+    while blob_cache_bytes > BLOB_CACHE_MAX_BYTES:
+        _, evicted = blob_cache.popitem(last=False)
+        blob_cache_bytes -= len(evicted)
+
+
+def read_blob(blob_dir, digest):
+    """Load a blob by its content hash."""
+    if not re.fullmatch(r'[0-9a-f]{64}', digest):
+        return None
+
+    path = os.path.join(blob_dir, f"{digest}.json.gz")
+    data = blob_cache.get(path)
+    if data is None:
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+        except OSError:
+            return None
+        cache_blob(path, data)
+    else:
+        blob_cache.move_to_end(path)
+
+    try:
+        return json.loads(gzip.decompress(data))
+    except (OSError, EOFError, ValueError):
+        return None
+
+
+def resolve_blobs(log):
+    """Return a copy of a log entry with blob references replaced by their content."""
+    input_data = log.get('input') if isinstance(log, dict) else None
+    if not isinstance(input_data, dict):
+        return log
+    if not any(is_blob_ref(value) for value in input_data.values()):
+        return log
+
+    blob_dir = os.path.join(LOG_DIR, 'blobs')
+    resolved_input = {}
+    for key, value in input_data.items():
+        if is_blob_ref(value):
+            content = read_blob(blob_dir, value['$blob'])
+            # Keep the reference if the blob is missing so nothing is lost silently
+            resolved_input[key] = value if content is None else content
+        else:
+            resolved_input[key] = value
+    return {**log, 'input': resolved_input}
+
+
+def parse_time(value):
+    """Parse an ISO 8601 time into the logger's UTC timestamp format.
+
+    Times without a timezone are taken as UTC. Raises ValueError if invalid
+    or before year 1000.
+    """
+    parsed = datetime.fromisoformat(value.strip().replace('Z', '+00:00'))
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    try:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    except OverflowError:
+        raise ValueError(f"Time out of range: {value}")
+    if parsed < EARLIEST_TIME:
+        raise ValueError(f"Time out of range: {value}")
+    return parsed.strftime(TIMESTAMP_FORMAT)
+
+
+def format_timestamp(moment):
+    """Format a naive UTC datetime, clamped to times the format can represent."""
+    return max(moment, EARLIEST_TIME).strftime(TIMESTAMP_FORMAT)
+
+
+def shift_timestamp(timestamp, delta):
+    """Move a timestamp in the logger's format by a timedelta, clamping at the ends."""
+    parsed = datetime.strptime(timestamp, TIMESTAMP_FORMAT)
+    try:
+        return format_timestamp(parsed + delta)
+    except OverflowError:
+        return format_timestamp(datetime.max if delta > timedelta(0) else datetime.min)
+
+
+def find_entry_at(f, pos):
+    """Find the first log entry starting at or after a byte offset.
+
+    Reads forward from the offset until an entry boundary is found and
+    returns its (offset, timestamp), or None if there are no more entries.
+    """
+    start = max(pos - 1, 0)
+    f.seek(start)
+    buffer = b''
+    search_from = pos - start
+    while True:
+        chunk = f.read(SEEK_CHUNK_SIZE)
+        if not chunk:
+            return None
+        buffer += chunk
+        match = ENTRY_START_RE.search(buffer, search_from)
+        if match:
+            return start + match.start(), match.group(1).decode('utf-8', 'replace')
+        # Keep a little overlap in case a boundary straddles two chunks
+        search_from = max(search_from, len(buffer) - 64)
+
+
+def find_time_offset(f, size, timestamp, after=False):
+    """Binary search for the offset of the first entry at (or after) a timestamp.
+
+    Entries are appended in time order, so each probe seeks to the middle of
+    the remaining range, resyncs to the next entry boundary and compares its
+    timestamp. With after=True, finds the first entry strictly after it.
+    Returns the file size if every entry is earlier.
+    """
+    lo, hi = 0, size
+    while lo < hi:
+        mid = (lo + hi) // 2
+        entry = find_entry_at(f, mid)
+        if entry is None or entry[0] >= hi:
+            hi = mid
+            continue
+        offset, entry_time = entry
+        if entry_time > timestamp or (entry_time == timestamp and not after):
+            hi = mid
+        else:
+            lo = offset + 1
+
+    entry = find_entry_at(f, lo)
+    return entry[0] if entry else size
+
+
+def read_time_range(filepath, since=None, until=None):
+    """Read only the part of a log file that can hold entries in a time range."""
+    with open(filepath, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        start = 0
+        end = size
+        if since:
+            start = find_time_offset(f, size, shift_timestamp(since, -TIME_SEEK_SLACK))
+        if until:
+            end = find_time_offset(f, size, shift_timestamp(until, TIME_SEEK_SLACK), after=True)
+        if end <= start:
+            return ''
+        f.seek(start)
+        return f.read(end - start).decode('utf-8', 'replace')
+
+
+def parse_log_file(filepath, since=None, until=None):
+    """Parse a log file containing concatenated JSON objects.
+
+    When since/until are given, only the matching byte range of the file is
+    read; callers still need to filter entries by timestamp exactly.
+    """
     logs = []
-    with open(filepath, 'r') as f:
-        content = f.read()
+    if since or until:
+        content = read_time_range(filepath, since, until)
+    else:
+        with open(filepath, 'r') as f:
+            content = f.read()
 
     decoder = json.JSONDecoder()
 
@@ -81,23 +283,29 @@ def get_available_dates():
     return dates
 
 
-def get_logs(date=None, hook_event=None, tool_name=None, search=None, limit=100):
-    """Get logs with optional filters."""
-    all_logs = []
+def get_log_files(date=None):
+    """Get the log files to read for a date, or all log files if no date."""
     log_path = Path(LOG_DIR)
 
     if not log_path.exists():
         return []
 
-    # Determine which files to read
     if date:
-        files = [log_path / f"hooks-{date}.json"]
-    else:
-        files = sorted(log_path.glob("hooks-*.json"), reverse=True)
+        return [log_path / f"hooks-{date}.json"]
+    return sorted(log_path.glob("hooks-*.json"), reverse=True)
 
-    for filepath in files:
+
+def get_logs(date=None, hook_event=None, tool_name=None, search=None, limit=100,
+             since=None, until=None):
+    """Get logs with optional filters.
+
+    since/until are inclusive timestamps in the logger's UTC format.
+    """
+    all_logs = []
+
+    for filepath in get_log_files(date):
         if filepath.exists():
-            logs = parse_log_file(filepath)
+            logs = parse_log_file(filepath, since=since, until=until)
             all_logs.extend(logs)
 
     # Sort by timestamp descending (newest first)
@@ -106,6 +314,13 @@ def get_logs(date=None, hook_event=None, tool_name=None, search=None, limit=100)
     # Apply filters
     filtered = []
     for log in all_logs:
+        # Filter by time range
+        timestamp = log.get('timestamp', '')
+        if since and timestamp < since:
+            continue
+        if until and timestamp > until:
+            continue
+
         # Filter by hook event
         if hook_event and log.get('hook_event') != hook_event:
             continue
@@ -116,9 +331,9 @@ def get_logs(date=None, hook_event=None, tool_name=None, search=None, limit=100)
             if input_data.get('tool_name') != tool_name:
                 continue
 
-        # Filter by search term
+        # Filter by search term (including payloads held in the blob store)
         if search:
-            log_str = json.dumps(log).lower()
+            log_str = json.dumps(resolve_blobs(log)).lower()
             if search.lower() not in log_str:
                 continue
 
@@ -146,17 +361,136 @@ def get_unique_values(logs, field_path):
     return sorted(values)
 
 
+def is_closed_day(date):
+    """Check if a date is before today, meaning its log file is no longer written."""
+    if not date or not re.fullmatch(r'\d{4}-\d{2}-\d{2}', date):
+        return False
+    return date < datetime.now().strftime('%Y-%m-%d')
+
+
+def get_cache_validators(files, key, listed_files=()):
+    """Build an ETag and Last-Modified time from log file sizes and mtimes.
+
+    The key (typically the request path and query string) is mixed into the
+    ETag since the same files produce different responses for different filters.
+    Only the names of listed_files are used, for responses that list them but
+    don't read their contents.
+    """
+    digest = hashlib.sha1(key.encode())
+    for filepath in listed_files:
+        digest.update(f"{filepath.name};".encode())
+
+    last_modified = None
+    for filepath in files:
+        try:
+            stat = filepath.stat()
+        except OSError:
+            continue
+        digest.update(f"{filepath.name}:{stat.st_size}:{stat.st_mtime_ns};".encode())
+        mtime = datetime.fromtimestamp(stat.st_mtime, tz=timezone.utc)
+        if last_modified is None or mtime > last_modified:
+            last_modified = mtime
+    return digest.hexdigest(), last_modified
+
+
+def is_not_modified(etag, last_modified):
+    """Check the request's conditional headers against the current validators."""
+    return not is_resource_modified(
+        request.environ,
+        etag=quote_etag(etag, weak=True),
+        last_modified=last_modified
+    )
+
+
+def set_cache_headers(response, etag, last_modified, max_age=0):
+    """Attach validators and caching policy to a response.
+
+    ETags are weak because the body may be compressed differently per client.
+    """
+    response.set_etag(etag, weak=True)
+    if last_modified:
+        response.last_modified = last_modified
+    if max_age:
+        response.cache_control.public = True
+        response.cache_control.max_age = max_age
+    else:
+        response.cache_control.no_cache = True
+    return response
+
+
+def get_time_range(args):
+    """Read since/until/minutes query parameters as logger timestamps.
+
+    minutes selects the last N minutes and takes precedence over since; very
+    large values are clamped to the earliest representable time.
+    Raises ValueError for values that can't be parsed.
+    """
+    since = parse_time(args['since']) if args.get('since') else None
+    until = parse_time(args['until']) if args.get('until') else None
+    if args.get('minutes'):
+        minutes = float(args['minutes'])
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+        try:
+            start = now - timedelta(minutes=minutes)
+        except OverflowError:
+            start = datetime.min if minutes > 0 else datetime.max
+        since = format_timestamp(start)
+    return since, until
+
+
+@app.after_request
+def compress_response(response):
+    """Compress text responses with br or gzip when the client accepts it."""
+    if (response.status_code != 200
+            or response.is_streamed
+            or response.direct_passthrough
+            or 'Content-Encoding' in response.headers
+            or response.mimetype not in COMPRESSIBLE_MIMETYPES):
+        return response
+
+    response.vary.add('Accept-Encoding')
+
+    encodings = ['br', 'gzip'] if brotli else ['gzip']
+    encoding = request.accept_encodings.best_match(encodings)
+    data = response.get_data()
+    if not encoding or len(data) < COMPRESS_MIN_SIZE:
+        return response
+
+    if encoding == 'br':
+        response.set_data(brotli.compress(data))
+    else:
+        response.set_data(gzip.compress(data, compresslevel=6))
+    response.headers['Content-Encoding'] = encoding
+    return response
+
+
 @app.route('/')
 def index():
     """Main page with log viewer."""
+    try:
+        since, until = get_time_range(request.args)
+    except (ValueError, OverflowError):
+        since, until = None, None
+
     dates = get_available_dates()
+    date = request.args.get('date', dates[0] if dates else None)
+
+    # The page reads only the selected day's file, but lists every available
+    # date, so appending to another day's file doesn't invalidate it.
+    # The resolved range is part of the key since "last N minutes" moves with time.
+    etag, last_modified = get_cache_validators(
+        get_log_files(date) if date else [],
+        f"{request.full_path}|{date}|{since}|{until}",
+        listed_files=get_log_files())
+    if is_not_modified(etag, last_modified):
+        return set_cache_headers(Response(status=304), etag, last_modified)
 
     # Get filter parameters
-    date = request.args.get('date', dates[0] if dates else None)
     hook_event = request.args.get('hook_event', '')
     tool_name = request.args.get('tool_name', '')
     search = request.args.get('search', '')
     limit = int(request.args.get('limit', 100))
+    minutes = request.args.get('minutes', '')
 
     # Get logs
     logs = get_logs(
@@ -164,16 +498,18 @@ def index():
         hook_event=hook_event if hook_event else None,
         tool_name=tool_name if tool_name else None,
         search=search if search else None,
-        limit=limit
+        limit=limit,
+        since=since,
+        until=until
     )
 
-    # Get all logs for extracting filter options
-    all_logs = get_logs(date=date, limit=1000)
+    # Get all logs in the time range for extracting filter options
+    all_logs = get_logs(date=date, limit=1000, since=since, until=until)
     hook_events = get_unique_values(all_logs, 'hook_event')
     tool_names = get_unique_values(all_logs, 'input.tool_name')
 
-    return render_template('index.html',
-                         logs=logs,
+    html = render_template('index.html',
+                         logs=[resolve_blobs(log) for log in logs],
                          dates=dates,
                          current_date=date,
                          hook_events=hook_events,
@@ -182,8 +518,13 @@ def index():
                          current_tool_name=tool_name,
                          search=search,
                          limit=limit,
+                         minutes=minutes,
+                         since=since,
+                         until=until,
                          total_count=len(logs))
 
+    return set_cache_headers(Response(html, mimetype='text/html'), etag, last_modified)
+
 
 @app.route('/api/logs')
 def api_logs():
@@ -193,16 +534,38 @@ def api_logs():
     tool_name = request.args.get('tool_name')
     search = request.args.get('search')
     limit = int(request.args.get('limit', 100))
+    resolve = request.args.get('resolve') in ('1', 'true')
+
+    try:
+        since, until = get_time_range(request.args)
+    except (ValueError, OverflowError):
+        return jsonify({'error': 'Invalid since, until or minutes'}), 400
+
+    # The resolved range is part of the key since "last N minutes" moves with time
+    etag, last_modified = get_cache_validators(
+        get_log_files(date), f"{request.full_path}|{since}|{until}")
+    # Only closed days that actually have a log file are safe to cache long-term
+    max_age = 0
+    if is_closed_day(date) and last_modified and not request.args.get('minutes'):
+        max_age = CLOSED_DAY_MAX_AGE
+    if is_not_modified(etag, last_modified):
+        return set_cache_headers(Response(status=304), etag, last_modified, max_age)
 
     logs = get_logs(
         date=date if date else None,
         hook_event=hook_event if hook_event else None,
         tool_name=tool_name if tool_name else None,
         search=search if search else None,
-        limit=limit
+        limit=limit,
+        since=since,
+        until=until
     )
 
-    return jsonify(logs)
+    # Blob references are left in place unless asked for, keeping polls cheap
+    if resolve:
+        logs = [resolve_blobs(log) for log in logs]
+
+    return set_cache_headers(jsonify(logs), etag, last_modified, max_age)
 
 
 @app.route('/api/log/<int:index>')
@@ -211,7 +574,7 @@ def api_log_detail(index):
     date = request.args.get('date')
     logs = get_logs(date=date, limit=1000)
     if 0 <= index < len(logs):
-        return jsonify(logs[index])
+        return jsonify(resolve_blobs(logs[index]))
     return jsonify({'error': 'Log not found'}), 404
 
 
@@ -274,7 +637,7 @@ def generate_sse_events(date):
                     new_entries = parse_new_entries(content, last_position)
 
                     for entry, end_pos in new_entries:
-                        yield f"data: {json.dumps({'type': 'log', 'data': entry})}\n\n"
+                        yield f"data: {json.dumps({'type': 'log', 'data': resolve_blobs(entry)})}\n\n"
                         last_position = end_pos
 
                     last_size = current_size
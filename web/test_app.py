@@ -2,13 +2,17 @@
 Tests for Claude Hooks Debug Web Viewer
 """
 
+import gzip
+import hashlib
 import json
 import pytest
 import tempfile
 import os
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
 
 # Import the app and functions to test
+import app as app_module
 from app import (
     app,
     parse_log_file,
@@ -17,6 +21,13 @@ from app import (
     get_logs,
     get_available_dates,
     get_unique_values,
+    is_closed_day,
+    is_blob_ref,
+    read_blob,
+    parse_time,
+    find_time_offset,
+    read_time_range,
+    resolve_blobs,
 )
 
 
@@ -400,5 +411,412 @@ class TestGetAvailableDates:
         assert dates == ['2026-02-01']
 
 
+@pytest.fixture
+def blob_log_file(tmp_path):
+    """Create a log file whose tool_response was moved to the blob store."""
+    body = {"stdout": "x" * 5000, "stderr": ""}
+    encoded = json.dumps(body, separators=(',', ':')).encode()
+    digest = hashlib.sha256(encoded).hexdigest()
+
+    blob_dir = tmp_path / "blobs"
+    blob_dir.mkdir()
+    with gzip.open(blob_dir / f"{digest}.json.gz", 'wb') as f:
+        f.write(encoded)
+
+    log = {
+        "timestamp": "2026-02-01T10:00:00Z",
+        "hook_event": "PostToolUse",
+        "project_dir": "/test/project",
+        "input": {
+            "tool_name": "Bash",
+            "tool_input": {"command": "yes x | head"},
+            "tool_response": {"$blob": digest, "size": len(encoded)}
+        }
+    }
+    log_file = tmp_path / "hooks-2026-02-01.json"
+    log_file.write_text(json.dumps(log, indent=2) + '\n')
+    return log_file
+
+
+class TestBlobStore:
+    """Tests for resolving payloads held in the blob store."""
+
+    def test_is_blob_ref(self):
+        assert is_blob_ref({"$blob": "abc", "size": 10}) is True
+        assert is_blob_ref({"stdout": "hello"}) is False
+        assert is_blob_ref("abc") is False
+
+    def test_resolve_blobs_replaces_reference(self, blob_log_file, monkeypatch):
+        monkeypatch.setattr('app.LOG_DIR', str(blob_log_file.parent))
+
+        log = parse_log_file(blob_log_file)[0]
+        resolved = resolve_blobs(log)
+
+        assert resolved['input']['tool_response']['stdout'] == 'x' * 5000
+        assert resolved['input']['tool_input'] == {"command": "yes x | head"}
+        # The parsed entry itself is left untouched
+        assert is_blob_ref(log['input']['tool_response'])
+
+    def test_resolve_blobs_keeps_missing_reference(self, tmp_path, monkeypatch):
+        monkeypatch.setattr('app.LOG_DIR', str(tmp_path))
+
+        ref = {"$blob": "0" * 64, "size": 10}
+        log = {"input": {"tool_response": ref}}
+        assert resolve_blobs(log)['input']['tool_response'] == ref
+
+    def test_blob_cache_stays_within_budget(self, tmp_path, monkeypatch):
+        monkeypatch.setattr('app.blob_cache', app_module.OrderedDict())
+        monkeypatch.setattr('app.blob_cache_bytes', 0)
+
+        digests = []
+        for i in range(5):
+            encoded = json.dumps({"content": f"{i}" * 5000}).encode()
+            digest = hashlib.sha256(encoded).hexdigest()
+            (tmp_path / f"{digest}.json.gz").write_bytes(gzip.compress(encoded))
+            digests.append(digest)
+
+        budget = (tmp_path / f"{digests[0]}.json.gz").stat().st_size * 2
+        monkeypatch.setattr('app.BLOB_CACHE_MAX_BYTES', budget)
+
+        for digest in digests:
+            assert read_blob(str(tmp_path), digest) is not None
+
+        assert len(app_module.blob_cache) == 2
+        assert app_module.blob_cache_bytes <= budget
+        # Evicted blobs are read from disk again
+        assert read_blob(str(tmp_path), digests[0])['content'] == '0' * 5000
+
+    def test_missing_blob_is_not_cached(self, tmp_path):
+        encoded = json.dumps({"content": "late"}).encode()
+        digest = hashlib.sha256(encoded).hexdigest()
+        assert read_blob(str(tmp_path), digest) is None
+
+        (tmp_path / f"{digest}.json.gz").write_bytes(gzip.compress(encoded))
+        assert read_blob(str(tmp_path), digest) == {"content": "late"}
+
+    def test_api_log_detail_resolves_blobs(self, client, blob_log_file, monkeypatch):
+        monkeypatch.setattr('app.LOG_DIR', str(blob_log_file.parent))
+
+        response = client.get('/api/log/0?date=2026-02-01')
+        data = json.loads(response.data)
+        assert data['input']['tool_response']['stdout'] == 'x' * 5000
+
+    def test_api_logs_resolves_only_on_request(self, client, blob_log_file, monkeypatch):
+        monkeypatch.setattr('app.LOG_DIR', str(blob_log_file.parent))
+
+        data = json.loads(client.get('/api/logs').data)
+        assert is_blob_ref(data[0]['input']['tool_response'])
+
+        data = json.loads(client.get('/api/logs?resolve=1').data)
+        assert data[0]['input']['tool_response']['stdout'] == 'x' * 5000
+
+    def test_search_matches_blob_content(self, blob_log_file, monkeypatch):
+        monkeypatch.setattr('app.LOG_DIR', str(blob_log_file.parent))
+
+        logs = get_logs(date='2026-02-01', search='xxxxxxxx')
+        assert len(logs) == 1
+
+
+class TestHttpCaching:
+    """Tests for conditional requests, cache lifetimes and compression."""
+
+    def test_is_closed_day(self):
+        assert is_closed_day('2000-01-01') is True
+        assert is_closed_day(datetime.now().strftime('%Y-%m-%d')) is False
+        assert is_closed_day(None) is False
+        assert is_closed_day('not-a-date') is False
+
+    def test_api_logs_returns_304_when_unchanged(self, client, sample_log_file, monkeypatch):
+        monkeypatch.setattr('app.LOG_DIR', str(sample_log_file.parent))
+
+        response = client.get('/api/logs?date=2026-02-01')
+        etag = response.headers['ETag']
+        assert response.headers['Last-Modified']
+
+        response = client.get('/api/logs?date=2026-02-01', headers={'If-None-Match': etag})
+        assert response.status_code == 304
+        assert response.data == b''
+
+    def test_api_logs_etag_changes_when_file_grows(self, client, sample_log_file, monkeypatch):
+        monkeypatch.setattr('app.LOG_DIR', str(sample_log_file.parent))
+
+        etag = client.get('/api/logs').headers['ETag']
+        with open(sample_log_file, 'a') as f:
+            f.write(json.dumps({
+                "timestamp": "2026-02-01T10:00:05Z",
+                "hook_event": "Stop",
+                "input": {}
+            }) + '\n')
+
+        response = client.get('/api/logs', headers={'If-None-Match': etag})
+        assert response.status_code == 200
+        assert response.headers['ETag'] != etag
+
+    def test_api_logs_etag_depends_on_filters(self, client, sample_log_file, monkeypatch):
+        monkeypatch.setattr('app.LOG_DIR', str(sample_log_file.parent))
+
+        etag = client.get('/api/logs?hook_event=Stop').headers['ETag']
+        response = client.get('/api/logs?hook_event=PreToolUse', headers={'If-None-Match': etag})
+        assert response.status_code == 200
+
+    def test_closed_day_is_cached_long_term(self, client, sample_log_file, monkeypatch):
+        monkeypatch.setattr('app.LOG_DIR', str(sample_log_file.parent))
+
+        response = client.get('/api/logs?date=2026-02-01')
+        assert response.cache_control.public is True
+        assert response.cache_control.max_age == 365 * 24 * 60 * 60
+
+    def test_today_must_revalidate(self, client, tmp_path, monkeypatch):
+        today = datetime.now().strftime('%Y-%m-%d')
+        (tmp_path / f'hooks-{today}.json').write_text('')
+        monkeypatch.setattr('app.LOG_DIR', str(tmp_path))
+
+        response = client.get(f'/api/logs?date={today}')
+        assert response.cache_control.no_cache
+        assert response.cache_control.max_age is None
+
+    def test_index_returns_304_when_unchanged(self, client, sample_log_file, monkeypatch):
+        monkeypatch.setattr('app.LOG_DIR', str(sample_log_file.parent))
+
+        etag = client.get('/').headers['ETag']
+        response = client.get('/', headers={'If-None-Match': etag})
+        assert response.status_code == 304
+
+    def test_past_day_page_ignores_writes_to_today(self, client, sample_log_file, monkeypatch):
+        monkeypatch.setattr('app.LOG_DIR', str(sample_log_file.parent))
+        today_file = sample_log_file.parent / f"hooks-{datetime.now().strftime('%Y-%m-%d')}.json"
+        today_file.write_text('')
+
+        etag = client.get('/?date=2026-02-01').headers['ETag']
+        with open(today_file, 'a') as f:
+            f.write(json.dumps({
+                "timestamp": datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ'),
+                "hook_event": "Stop",
+                "input": {}
+            }) + '\n')
+
+        response = client.get('/?date=2026-02-01', headers={'If-None-Match': etag})
+        assert response.status_code == 304
+
+    def test_index_etag_changes_when_a_new_day_appears(self, client, sample_log_file, monkeypatch):
+        monkeypatch.setattr('app.LOG_DIR', str(sample_log_file.parent))
+
+        etag = client.get('/?date=2026-02-01').headers['ETag']
+        (sample_log_file.parent / 'hooks-2026-02-02.json').write_text('')
+
+        response = client.get('/?date=2026-02-01', headers={'If-None-Match': etag})
+        assert response.status_code == 200
+        assert b'2026-02-02' in response.data
+
+    def test_index_etag_changes_when_selected_day_grows(self, client, sample_log_file, monkeypatch):
+        monkeypatch.setattr('app.LOG_DIR', str(sample_log_file.parent))
+
+        etag = client.get('/?date=2026-02-01').headers['ETag']
+        with open(sample_log_file, 'a') as f:
+            f.write(json.dumps({"timestamp": "2026-02-01T10:00:05Z", "hook_event": "Stop", "input": {}}) + '\n')
+
+        response = client.get('/?date=2026-02-01', headers={'If-None-Match': etag})
+        assert response.status_code == 200
+
+    def test_gzip_compression(self, client, sample_log_file, monkeypatch):
+        monkeypatch.setattr('app.LOG_DIR', str(sample_log_file.parent))
+
+        plain = client.get('/api/logs')
+        response = client.get('/api/logs', headers={'Accept-Encoding': 'gzip'})
+
+        assert response.headers['Content-Encoding'] == 'gzip'
+        assert 'Accept-Encoding' in response.headers['Vary']
+        assert gzip.decompress(response.data) == plain.data
+
+    def test_no_compression_without_accept_encoding(self, client, sample_log_file, monkeypatch):
+        monkeypatch.setattr('app.LOG_DIR', str(sample_log_file.parent))
+
+        response = client.get('/api/logs')
+        assert 'Content-Encoding' not in response.headers
+
+
+@pytest.fixture
+def timed_log_file(tmp_path):
+    """Create a log file with one entry every 10 seconds over an hour."""
+    start = datetime(2026, 2, 1, 10, 0, 0)
+    log_file = tmp_path / "hooks-2026-02-01.json"
+    with open(log_file, 'w') as f:
+        for i in range(360):
+            log = {
+                "timestamp": (start + timedelta(seconds=10 * i)).strftime('%Y-%m-%dT%H:%M:%SZ'),
+                "hook_event": "PostToolUse",
+                "project_dir": "/test/project",
+                "input": {"tool_name": "Read", "tool_response": {"content": "y" * 200}}
+            }
+            f.write(json.dumps(log, indent=2))
+            f.write('\n')
+    return log_file
+
+
+class TestTimeRange:
+    """Tests for since/until queries using binary search over log files."""
+
+    def test_parse_time(self):
+        assert parse_time('2026-02-01T10:00:00Z') == '2026-02-01T10:00:00Z'
+        assert parse_time('2026-02-01T10:00:00') == '2026-02-01T10:00:00Z'
+        assert parse_time('2026-02-01T12:00:00+02:00') == '2026-02-01T10:00:00Z'
+        with pytest.raises(ValueError):
+            parse_time('yesterday')
+
+    def test_find_time_offset_matches_linear_scan(self, timed_log_file):
+        content = timed_log_file.read_bytes()
+        with open(timed_log_file, 'rb') as f:
+            for target in ['2026-02-01T09:00:00Z', '2026-02-01T10:00:00Z',
+                           '2026-02-01T10:17:35Z', '2026-02-01T10:30:00Z',
+                           '2026-02-01T10:59:50Z', '2026-02-01T12:00:00Z']:
+                offset = find_time_offset(f, len(content), target)
+                marker = b'{\n  "timestamp": "'
+                expected = content.find(marker)
+                while expected != -1:
+                    ts = content[expected + len(marker):expected + len(marker) + 20].decode()
+                    if ts >= target:
+                        break
+                    expected = content.find(marker, expected + 1)
+                assert offset == (expected if expected != -1 else len(content))
+
+    def test_find_time_offset_after(self, timed_log_file):
+        size = timed_log_file.stat().st_size
+        with open(timed_log_file, 'rb') as f:
+            at = find_time_offset(f, size, '2026-02-01T10:30:00Z')
+            after = find_time_offset(f, size, '2026-02-01T10:30:00Z', after=True)
+        assert after > at
+
+    def test_read_time_range_reads_only_a_slice(self, timed_log_file):
+        content = read_time_range(timed_log_file, since='2026-02-01T10:58:00Z')
+        assert len(content) < timed_log_file.stat().st_size // 10
+        assert '"2026-02-01T10:59:50Z"' in content
+
+    def test_get_logs_since_until(self, timed_log_file, monkeypatch):
+        monkeypatch.setattr('app.LOG_DIR', str(timed_log_file.parent))
+
+        logs = get_logs(date='2026-02-01', since='2026-02-01T10:10:00Z',
+                        until='2026-02-01T10:11:00Z', limit=1000)
+
+        timestamps = sorted(log['timestamp'] for log in logs)
+        assert timestamps[0] == '2026-02-01T10:10:00Z'
+        assert timestamps[-1] == '2026-02-01T10:11:00Z'
+        assert len(timestamps) == 7
+
+    def test_api_logs_since(self, client, timed_log_file, monkeypatch):
+        monkeypatch.setattr('app.LOG_DIR', str(timed_log_file.parent))
+
+        response = client.get('/api/logs?since=2026-02-01T10:59:00Z')
+        data = json.loads(response.data)
+        assert [log['timestamp'] for log in data] == [
+            '2026-02-01T10:59:50Z', '2026-02-01T10:59:40Z', '2026-02-01T10:59:30Z',
+            '2026-02-01T10:59:20Z', '2026-02-01T10:59:10Z', '2026-02-01T10:59:00Z',
+        ]
+
+    def test_api_logs_last_minutes(self, client, tmp_path, monkeypatch):
+        now = datetime.now(timezone.utc)
+        log_file = tmp_path / f"hooks-{now.strftime('%Y-%m-%d')}.json"
+        with open(log_file, 'w') as f:
+            for age in [120, 30, 5]:
+                log = {
+                    "timestamp": (now - timedelta(minutes=age)).strftime('%Y-%m-%dT%H:%M:%SZ'),
+                    "hook_event": "Stop",
+                    "input": {}
+                }
+                f.write(json.dumps(log, indent=2) + '\n')
+        monkeypatch.setattr('app.LOG_DIR', str(tmp_path))
+
+        data = json.loads(client.get('/api/logs?minutes=60').data)
+        assert len(data) == 2
+
+        response = client.get('/api/logs?minutes=60')
+        assert response.cache_control.max_age is None
+
+    def test_api_logs_rejects_invalid_time(self, client, sample_log_file, monkeypatch):
+        monkeypatch.setattr('app.LOG_DIR', str(sample_log_file.parent))
+
+        response = client.get('/api/logs?since=not-a-time')
+        assert response.status_code == 400
+
+    @pytest.mark.parametrize('query', [
+        'since=0999-01-01T00:00:00',
+        'since=0001-01-01T00:00:00%2B01:00',
+        'minutes=nan',
+    ])
+    def test_api_logs_rejects_out_of_range_time(self, client, sample_log_file, monkeypatch, query):
+        monkeypatch.setattr('app.LOG_DIR', str(sample_log_file.parent))
+
+        response = client.get(f'/api/logs?{query}')
+        assert response.status_code == 400
+
+    @pytest.mark.parametrize('query', [
+        'until=9999-12-31T23:59:59',
+        'since=1000-01-01T00:00:00',
+        'minutes=1e9',
+        'minutes=inf',
+        'minutes=-inf',
+    ])
+    def test_api_logs_clamps_extreme_time(self, client, sample_log_file, monkeypatch, query):
+        monkeypatch.setattr('app.LOG_DIR', str(sample_log_file.parent))
+
+        response = client.get(f'/api/logs?date=2026-02-01&{query}')
+        assert response.status_code == 200
+
+    def test_extreme_ranges_include_everything(self, client, sample_log_file, monkeypatch):
+        monkeypatch.setattr('app.LOG_DIR', str(sample_log_file.parent))
+
+        for query in ['until=9999-12-31T23:59:59', 'minutes=inf', 'minutes=1e9']:
+            data = json.loads(client.get(f'/api/logs?date=2026-02-01&{query}').data)
+            assert len(data) == 5
+
+    @pytest.mark.parametrize('query', [
+        'since=0999-01-01T00:00:00',
+        'until=9999-12-31T23:59:59',
+        'minutes=inf',
+        'minutes=nan',
+    ])
+    def test_index_ignores_bad_or_extreme_time(self, client, sample_log_file, monkeypatch, query):
+        monkeypatch.setattr('app.LOG_DIR', str(sample_log_file.parent))
+
+        response = client.get(f'/?{query}')
+        assert response.status_code == 200
+
+    def test_index_reads_only_the_time_range(self, client, timed_log_file, monkeypatch):
+        monkeypatch.setattr('app.LOG_DIR', str(timed_log_file.parent))
+
+        reads = []
+        real_read_time_range = read_time_range
+
+        def tracking_read_time_range(*args, **kwargs):
+            content = real_read_time_range(*args, **kwargs)
+            reads.append(len(content))
+            return content
+
+        monkeypatch.setattr('app.read_time_range', tracking_read_time_range)
+
+        # Whole-file reads go through open() in text mode
+        full_reads = []
+
+        def tracking_open(file, mode='r', *args, **kwargs):
+            if mode == 'r':
+                full_reads.append(file)
+            return open(file, mode, *args, **kwargs)
+
+        monkeypatch.setattr('app.open', tracking_open, raising=False)
+
+        response = client.get('/?date=2026-02-01&since=2026-02-01T10:58:00Z')
+        assert response.status_code == 200
+        # Both the entry list and the filter dropdowns use the ranged read
+        assert len(reads) == 2
+        assert full_reads == []
+        assert all(size < timed_log_file.stat().st_size // 10 for size in reads)
+
+    def test_index_with_minutes(self, client, sample_log_file, monkeypatch):
+        monkeypatch.setattr('app.LOG_DIR', str(sample_log_file.parent))
+
+        response = client.get('/?minutes=5')
+        assert response.status_code == 200
+        assert b'Last 5 minutes' in response.data
+
+
 if __name__ == '__main__':
     pytest.main([__file__, '-v'])
@@ -0,0 +1,320 @@
+"""
+Tests for the debug logger (blob store, capture policy) and installer
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import pytest
+from pathlib import Path
+
+from app import parse_log_file, is_blob_ref, resolve_blobs
+
+REPO_DIR = Path(__file__).resolve().parent.parent
+LOGGER = REPO_DIR / "hooks" / "debug_logger.sh"
+INSTALLER = REPO_DIR / "install.sh"
+
+pytestmark = pytest.mark.skipif(shutil.which('jq') is None, reason="jq is required")
+
+
+def run_logger(tmp_path, payload, policy=None, blob_threshold=None, extra_env=None):
+    """Run the logger on a payload and return all entries logged so far."""
+    log_dir = tmp_path / "logs"
+    env = {**os.environ, 'CLAUDE_HOOKS_DEBUG_LOG_DIR': str(log_dir), **(extra_env or {})}
+    env.pop('CLAUDE_HOOKS_DEBUG_BLOB_THRESHOLD', None)
+    if blob_threshold is not None:
+        env['CLAUDE_HOOKS_DEBUG_BLOB_THRESHOLD'] = str(blob_threshold)
+    if policy is not None:
+        policy_file = tmp_path / "capture_policy.json"
+        text = policy if isinstance(policy, str) else json.dumps(policy)
+        # Only rewrite on change so the logger's compiled policy cache is reused
+        if not policy_file.exists() or policy_file.read_text() != text:
+            policy_file.write_text(text)
+        env['CLAUDE_HOOKS_DEBUG_POLICY'] = str(policy_file)
+    else:
+        env['CLAUDE_HOOKS_DEBUG_POLICY'] = str(tmp_path / "missing.json")
+
+    subprocess.run(['bash', str(LOGGER)], input=json.dumps(payload), env=env,
+                   capture_output=True, text=True, check=True)
+
+    logs = []
+    for log_file in sorted(log_dir.glob("hooks-*.json")):
+        logs.extend(parse_log_file(log_file))
+    return logs
+
+
+def run_installer(home, policy=None):
+    """Run the installer against a temporary home directory."""
+    env = {**os.environ, 'HOME': str(home)}
+    if policy is not None:
+        policy_file = home / "capture_policy.json"
+        policy_file.write_text(policy if isinstance(policy, str) else json.dumps(policy))
+        env['CLAUDE_HOOKS_DEBUG_POLICY'] = str(policy_file)
+    else:
+        env['CLAUDE_HOOKS_DEBUG_POLICY'] = str(home / "missing.json")
+
+    return subprocess.run(['bash', str(INSTALLER)], env=env,
+                          capture_output=True, text=True)
+
+
+def counting_jq(tmp_path):
+    """Put a jq wrapper first on PATH that records each call; returns (env, counter)."""
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    calls = tmp_path / "jq_calls"
+    wrapper = bin_dir / "jq"
+    wrapper.write_text(f'#!/bin/bash\necho >> "{calls}"\nexec "{shutil.which("jq")}" "$@"\n')
+    wrapper.chmod(0o755)
+
+    def count():
+        return len(calls.read_text().splitlines()) if calls.exists() else 0
+
+    return {'PATH': f"{bin_dir}{os.pathsep}{os.environ['PATH']}"}, count
+
+
+def compact_size(value):
+    """Size in bytes of a value as written by jq -c."""
+    return len(json.dumps(value, separators=(',', ':'), ensure_ascii=False).encode())
+
+
+def large_read_payload():
+    """A PostToolUse Read event whose tool_response is over the blob threshold."""
+    return {
+        "hook_event_name": "PostToolUse",
+        "tool_name": "Read",
+        "tool_input": {"file_path": "/src/app.py"},
+        "tool_response": {"content": "line of code\n" * 500, "note": "é"}
+    }
+
+
+class TestBlobStore:
+    """Tests for moving large payloads into the blob store in the logger."""
+
+    def test_large_field_round_trips_through_resolve(self, tmp_path, monkeypatch):
+        payload = large_read_payload()
+        logs = run_logger(tmp_path, payload)
+
+        ref = logs[0]['input']['tool_response']
+        assert is_blob_ref(ref)
+        assert ref['size'] == compact_size(payload['tool_response'])
+        assert logs[0]['input']['tool_input'] == payload['tool_input']
+
+        blob_file = tmp_path / "logs" / "blobs" / f"{ref['$blob']}.json.gz"
+        assert hashlib.sha256(gzip.decompress(blob_file.read_bytes())).hexdigest() == ref['$blob']
+
+        monkeypatch.setattr('app.LOG_DIR', str(tmp_path / "logs"))
+        assert resolve_blobs(logs[0])['input'] == payload
+
+    def test_threshold_boundary(self, tmp_path):
+        payload = large_read_payload()
+        size = compact_size(payload['tool_response'])
+
+        logs = run_logger(tmp_path, payload, blob_threshold=size)
+        assert logs[-1]['input']['tool_response'] == payload['tool_response']
+
+        logs = run_logger(tmp_path, payload, blob_threshold=size - 1)
+        assert is_blob_ref(logs[-1]['input']['tool_response'])
+
+    def test_repeated_body_is_stored_once(self, tmp_path):
+        payload = large_read_payload()
+        run_logger(tmp_path, payload)
+        logs = run_logger(tmp_path, payload)
+
+        assert logs[0]['input']['tool_response'] == logs[1]['input']['tool_response']
+        assert len(list((tmp_path / "logs" / "blobs").iterdir())) == 1
+
+    def test_threshold_zero_disables_blob_store(self, tmp_path):
+        payload = large_read_payload()
+        logs = run_logger(tmp_path, payload, blob_threshold=0)
+
+        assert logs[0]['input']['tool_response'] == payload['tool_response']
+        assert not (tmp_path / "logs" / "blobs").exists()
+
+    def test_small_fields_are_kept_inline(self, tmp_path):
+        payload = {"hook_event_name": "PreToolUse", "tool_name": "Bash",
+                   "tool_input": {"command": "ls"}}
+        logs = run_logger(tmp_path, payload)
+
+        assert logs[0]['input'] == payload
+        assert not (tmp_path / "logs" / "blobs").exists()
+
+    def test_policy_shrunk_field_is_not_stored(self, tmp_path):
+        # The raw body is over the threshold, but truncation brings it under
+        payload = large_read_payload()
+        logs = run_logger(tmp_path, payload, policy={"truncate_fields": {"tool_response": 100}})
+
+        assert logs[0]['input']['tool_response']['$truncated'] is True
+        assert not (tmp_path / "logs" / "blobs").exists()
+
+    def test_policy_untouched_field_is_still_stored(self, tmp_path):
+        payload = large_read_payload()
+        logs = run_logger(tmp_path, payload, policy={"drop_fields": ["tool_input.file_path"]})
+
+        assert is_blob_ref(logs[0]['input']['tool_response'])
+        assert logs[0]['input']['tool_input'] == {}
+
+    def test_policy_dropped_field_is_not_stored(self, tmp_path):
+        payload = large_read_payload()
+        logs = run_logger(tmp_path, payload, policy={"drop_fields": ["tool_response"]})
+
+        assert 'tool_response' not in logs[0]['input']
+        assert not (tmp_path / "logs" / "blobs").exists()
+
+
+class TestCapturePolicy:
+    """Tests for event filtering, sampling and field projection in the logger."""
+
+    def test_logs_everything_without_policy(self, tmp_path):
+        logs = run_logger(tmp_path, {"hook_event_name": "PreToolUse", "tool_name": "Glob"})
+        assert len(logs) == 1
+        assert logs[0]['hook_event'] == 'PreToolUse'
+
+    def test_disabled_tool_is_dropped(self, tmp_path):
+        policy = {"disabled_tools": ["Glob"]}
+        logs = run_logger(tmp_path, {"hook_event_name": "PreToolUse", "tool_name": "Glob"}, policy)
+        assert logs == []
+
+        logs = run_logger(tmp_path, {"hook_event_name": "PreToolUse", "tool_name": "Bash"}, policy)
+        assert len(logs) == 1
+
+    def test_disabled_event_is_dropped(self, tmp_path):
+        policy = {"disabled_events": ["Notification"]}
+        logs = run_logger(tmp_path, {"hook_event_name": "Notification", "message": "hi"}, policy)
+        assert logs == []
+
+    def test_sample_rate_zero_drops_events(self, tmp_path):
+        policy = {"sample_rates": {"Read": 0}}
+        for i in range(5):
+            payload = {"hook_event_name": "PreToolUse", "tool_name": "Read", "tool_use_id": f"t{i}"}
+            assert run_logger(tmp_path, payload, policy) == []
+
+    def test_sampling_keeps_tool_use_pairs_together(self, tmp_path):
+        policy = {"sample_rates": {"Read": 0.5}}
+        logs = []
+        for i in range(40):
+            pre = {"hook_event_name": "PreToolUse", "tool_name": "Read", "tool_use_id": f"toolu_{i:03d}"}
+            post = {**pre, "hook_event_name": "PostToolUse", "tool_response": {"content": "x"}}
+            run_logger(tmp_path, pre, policy)
+            logs = run_logger(tmp_path, post, policy)
+
+        counts = {}
+        for log in logs:
+            tool_use_id = log['input']['tool_use_id']
+            counts[tool_use_id] = counts.get(tool_use_id, 0) + 1
+
+        # Both halves of each pair are logged or dropped together
+        assert set(counts.values()) == {2}
+        assert 0 < len(counts) < 40
+
+    def test_dropped_event_uses_one_jq_process(self, tmp_path):
+        env, jq_calls = counting_jq(tmp_path)
+        policy = {"disabled_tools": ["Glob"], "truncate_fields": {"tool_response": 100}}
+
+        # The first run compiles the policy cache
+        run_logger(tmp_path, {"hook_event_name": "Stop"}, policy, extra_env=env)
+        start = jq_calls()
+        run_logger(tmp_path, {"hook_event_name": "PreToolUse", "tool_name": "Glob"}, policy, extra_env=env)
+        assert jq_calls() - start == 1
+
+    def test_kept_event_adds_no_jq_process(self, tmp_path):
+        env, jq_calls = counting_jq(tmp_path)
+        policy = {"disabled_tools": ["Glob"], "truncate_fields": {"tool_response": 100}}
+        run_logger(tmp_path, {"hook_event_name": "Stop"}, policy, extra_env=env)
+
+        # One pass for the policy decision and projection, one to build the entry
+        for payload in [
+            {"hook_event_name": "PreToolUse", "tool_name": "Bash", "tool_input": {"command": "ls"}},
+            {"hook_event_name": "PostToolUse", "tool_name": "Bash", "tool_response": "y" * 500},
+        ]:
+            start = jq_calls()
+            run_logger(tmp_path, payload, policy, extra_env=env)
+            assert jq_calls() - start == 2
+
+    def test_errors_bypass_policy(self, tmp_path):
+        policy = {"disabled_tools": ["Read"], "truncate_fields": {"tool_response": 4}}
+        payload = {
+            "hook_event_name": "PostToolUse",
+            "tool_name": "Read",
+            "tool_response": {"error": "ENOENT: no such file or directory"}
+        }
+        logs = run_logger(tmp_path, payload, policy)
+        assert len(logs) == 1
+        assert logs[0]['input']['tool_response'] == payload['tool_response']
+
+    def test_truncates_fields(self, tmp_path):
+        policy = {"truncate_fields": {"tool_response": 20}}
+        payload = {
+            "hook_event_name": "PostToolUse",
+            "tool_name": "Bash",
+            "tool_response": {"stdout": "a" * 100}
+        }
+        response = run_logger(tmp_path, payload, policy)[0]['input']['tool_response']
+        assert response['$truncated'] is True
+        assert response['size'] == len(json.dumps(payload['tool_response'], separators=(',', ':')))
+        assert len(response['preview'].encode()) <= 20
+
+    def test_truncation_preview_is_byte_limited(self, tmp_path):
+        policy = {"truncate_fields": {"tool_response": 5}}
+        payload = {"hook_event_name": "PostToolUse", "tool_name": "Bash", "tool_response": "é" * 10}
+        response = run_logger(tmp_path, payload, policy)[0]['input']['tool_response']
+        assert response['size'] == 20
+        assert response['preview'] == "éé"
+
+    def test_drops_fields(self, tmp_path):
+        policy = {"drop_fields": ["tool_input.content"]}
+        payload = {
+            "hook_event_name": "PreToolUse",
+            "tool_name": "Write",
+            "tool_input": {"file_path": "/a", "content": "data"}
+        }
+        logs = run_logger(tmp_path, payload, policy)
+        assert logs[0]['input']['tool_input'] == {"file_path": "/a"}
+
+    @pytest.mark.parametrize('policy', [
+        '{ "disabled_tools": ["Glob",] }',
+        {"disabled_tools": ["Glob"], "sample_rates": {"Read": "0.5"}},
+        {"disabled_tools": ["Glob"], "truncate_fields": {"tool_response": "10"}},
+    ])
+    def test_invalid_policy_captures_everything(self, tmp_path, policy):
+        logs = run_logger(tmp_path, {"hook_event_name": "PreToolUse", "tool_name": "Glob"}, policy)
+        assert len(logs) == 1
+
+
+class TestInstaller:
+    """Tests for the installer's capture policy handling."""
+
+    def test_skips_disabled_events(self, tmp_path):
+        result = run_installer(tmp_path, {"disabled_events": ["Stop", "Notification"]})
+        assert result.returncode == 0
+
+        settings = json.loads((tmp_path / ".claude" / "settings.json").read_text())
+        assert sorted(settings['hooks']) == ['PostToolUse', 'PreToolUse', 'UserPromptSubmit']
+
+    @pytest.mark.parametrize('policy', [
+        {"disabled_events": "Stop"},
+        {"disabled_events": ["Stop"], "sample_rates": {"Read": "0.5"}},
+        [],
+    ])
+    def test_policy_the_logger_rejects_installs_all_events(self, tmp_path, policy):
+        result = run_installer(tmp_path, policy)
+        assert result.returncode == 0
+        assert 'invalid capture policy' in result.stdout
+
+        settings = json.loads((tmp_path / ".claude" / "settings.json").read_text())
+        assert 'Stop' in settings['hooks']
+
+    def test_invalid_policy_installs_all_events(self, tmp_path):
+        settings_file = tmp_path / ".claude" / "settings.json"
+        settings_file.parent.mkdir()
+        settings_file.write_text(json.dumps({"model": "opus"}))
+
+        result = run_installer(tmp_path, '{ "disabled_events": ["Stop",] }')
+        assert result.returncode == 0
+        assert 'invalid capture policy' in result.stdout
+
+        settings = json.loads(settings_file.read_text())
+        assert settings['model'] == 'opus'
+        assert 'Stop' in settings['hooks']